@@ -1,11 +1,44 @@
 import streamlit as st
+import asyncio
+import functools
 import os
 from models.llm import AzureOpenAIModel
 from utils.memory import ChatMemory
 from utils.rag import RAGSystem
 from utils.web_search import WebSearchTool
+from utils.tokens import trim_to_token_budget, truncate_to_token_budget
 from config.config import config
+import re
 import uuid
+from collections import deque
+from typing import Optional
+
+WEB_SEARCH_INDICATORS = [
+    "latest", "recent", "current", "news", "today", "2024", "2025",
+    "what's happening", "breaking", "update", "trend", "stock price",
+    "analyst", "rating", "target price", "Q1", "Q2", "Q3", "Q4"
+]
+# One pass over the lowercased prompt for all indicators; whole words only, plurals allowed
+_WEB_SEARCH_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(indicator.lower()) for indicator in WEB_SEARCH_INDICATORS) + r")s?\b"
+)
+
+SYSTEM_PROMPT_TEMPLATE = """You are an AI Financial Research Assistant specializing in Amazon investor relations and financial analysis.
+
+When answering financial questions:
+1. Be precise with numbers and metrics
+2. Compare year-over-year changes when relevant
+3. Explain financial terms if needed
+4. Highlight important trends
+5. Always cite your sources
+
+Response Mode: {response_mode}
+- Concise: Focus on key numbers and brief explanations
+- Detailed: Include full context, comparisons, and analysis
+
+Available Context:
+"""
+NO_CONTEXT_MESSAGE = "No specific context available. I'll answer based on general knowledge."
 
 # Page configuration
 st.set_page_config(
@@ -14,17 +47,35 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize session state
+# Stateless clients and the document index are built once per process and shared by all sessions
+@st.cache_resource
+def get_llm_model() -> AzureOpenAIModel:
+    return AzureOpenAIModel()
+
+@st.cache_resource
+def get_rag_system() -> RAGSystem:
+    return RAGSystem()
+
+@st.cache_resource
+def get_web_search() -> WebSearchTool:
+    return WebSearchTool()
+
+# Initialize per-user session state
 if 'session_id' not in st.session_state:
     st.session_state.session_id = str(uuid.uuid4())
 if 'memory' not in st.session_state:
     st.session_state.memory = ChatMemory(st.session_state.session_id)
-if 'llm_model' not in st.session_state:
-    st.session_state.llm_model = AzureOpenAIModel()
-if 'rag_system' not in st.session_state:
-    st.session_state.rag_system = RAGSystem()
-if 'web_search' not in st.session_state:
-    st.session_state.web_search = WebSearchTool()
+if 'messages_cache' not in st.session_state:
+    # In-session mirror of the chat for rendering and prompt building; ChatMemory persists it
+    st.session_state.messages_cache = deque(
+        st.session_state.memory.get_messages(include_metadata=True),
+        maxlen=st.session_state.memory.max_length
+    )
+
+def add_message(role: str, content: str, metadata: dict = None):
+    """Persist a message and mirror it into the session's message cache"""
+    st.session_state.memory.add_message(role, content, metadata)
+    st.session_state.messages_cache.append(st.session_state.memory.messages[-1])
 
 def main():
     st.title("🔍 Amazon Financial Insights Chatbot")
@@ -81,8 +132,11 @@ TAVILY_API_KEY=your_key
                             temp_paths.append(temp_path)
                         
                         # Process documents
-                        doc_count = st.session_state.rag_system.process_and_store_documents(temp_paths)
-                        st.success(f"✅ Processed {doc_count} document chunks from uploaded files")
+                        doc_count = get_rag_system().process_and_store_documents(temp_paths)
+                        if doc_count:
+                            st.success(f"✅ Processed {doc_count} document chunks from uploaded files")
+                        else:
+                            st.error("⚠️ No document chunks were stored; check the files and embedding service")
                         
                         # Clean up temp files
                         for path in temp_paths:
@@ -95,6 +149,7 @@ TAVILY_API_KEY=your_key
         st.header("Chat Management")
         if st.button("Clear Chat History"):
             st.session_state.memory.clear_memory()
+            st.session_state.messages_cache.clear()
             st.rerun()
     
     # Main chat interface
@@ -102,8 +157,7 @@ TAVILY_API_KEY=your_key
     
     # Display chat history
     with chat_container:
-        messages = st.session_state.memory.get_messages(include_metadata=True)
-        for message in messages:
+        for message in st.session_state.messages_cache:
             with st.chat_message(message["role"]):
                 st.write(message["content"])
                 if message.get("metadata", {}).get("sources"):
@@ -113,7 +167,7 @@ TAVILY_API_KEY=your_key
     # Chat input
     if prompt := st.chat_input("Ask me anything about research, documents, or any topic..."):
         # Add user message to memory
-        st.session_state.memory.add_message("user", prompt)
+        add_message("user", prompt)
         
         # Display user message
         with st.chat_message("user"):
@@ -122,14 +176,15 @@ TAVILY_API_KEY=your_key
         # Generate assistant response
         with st.chat_message("assistant"):
             with st.spinner("Thinking..."):
-                response, sources = generate_response(
+                response_stream, sources = generate_response(
                     prompt, 
                     response_mode, 
                     use_rag, 
                     use_web_search
                 )
             
-            st.write(response)
+            # Render tokens as they arrive and collect the full reply
+            response = st.write_stream(response_stream)
             
             if sources:
                 with st.expander("Sources"):
@@ -137,17 +192,31 @@ TAVILY_API_KEY=your_key
         
         # Add assistant response to memory
         metadata = {"sources": sources} if sources else {}
-        st.session_state.memory.add_message("assistant", response, metadata)
+        add_message("assistant", response, metadata)
 
-def generate_response(prompt: str, response_mode: str, use_rag: bool, use_web_search: bool) -> tuple:
-    """Generate response using available tools"""
+async def gather_context(
+    prompt: str,
+    rag_system: Optional[RAGSystem],
+    web_search: Optional[WebSearchTool]
+) -> tuple:
+    """Run document retrieval and web search concurrently, return context and sources.
+    
+    Pass None for a tool that is disabled.
+    """
     context = ""
     sources = []
     needs_web_search = False
+    # Lowercase once; both keyword matchers work on this buffer
+    prompt_lc = prompt.lower()
+    
+    # Start the web search up front so it overlaps with document retrieval
+    web_task = None
+    if web_search is not None and should_use_web_search(prompt_lc):
+        web_task = asyncio.create_task(web_search.asearch(prompt))
     
     # Get RAG context
-    if use_rag:
-        rag_context, is_financial = st.session_state.rag_system.retrieve_relevant_context(prompt)
+    if rag_system is not None:
+        rag_context, is_financial = await rag_system.aretrieve_relevant_context(prompt, query_lc=prompt_lc)
         if rag_context:
             context += rag_context
             # Check if the response is coming from default document
@@ -161,58 +230,63 @@ def generate_response(prompt: str, response_mode: str, use_rag: bool, use_web_se
             needs_web_search = True
     
     # Get web search context if enabled and needed
-    if use_web_search and (needs_web_search or should_use_web_search(prompt)):
-        search_results = st.session_state.web_search.search(prompt)
-        web_context = st.session_state.web_search.format_search_results(search_results)
+    if web_search is not None and needs_web_search and web_task is None:
+        web_task = asyncio.create_task(web_search.asearch(prompt))
+    
+    if web_task is not None:
+        search_results = await web_task
+        web_context = web_search.format_search_results(search_results)
         context += "\n" + web_context
         if search_results.get("results"):
             sources.extend([f"🌐 {result.get('title', 'Financial Source')}" for result in search_results["results"][:3]])
     
-    # Prepare specialized system prompt for financial queries
-    system_prompt = f"""You are an AI Financial Research Assistant specializing in Amazon investor relations and financial analysis.
-
-When answering financial questions:
-1. Be precise with numbers and metrics
-2. Compare year-over-year changes when relevant
-3. Explain financial terms if needed
-4. Highlight important trends
-5. Always cite your sources
-
-Response Mode: {response_mode}
-- Concise: Focus on key numbers and brief explanations
-- Detailed: Include full context, comparisons, and analysis
-
-Available Context:
-{context if context else "No specific context available. I'll answer based on general knowledge."}
-"""
-
+    # Keep documents plus web results within budget so they can't crowd out the reply
+    context = truncate_to_token_budget(context, config.AZURE_OPENAI_DEPLOYMENT_NAME, config.MAX_CONTEXT_TOKENS)
+    return context, sources
 
+def generate_response(prompt: str, response_mode: str, use_rag: bool, use_web_search: bool) -> tuple:
+    """Gather context and return a streaming response along with its sources"""
+    # Resolve the shared tools before entering the event loop: building the RAG system
+    # may load or embed the default document, which runs its own asyncio.run
+    rag_system = get_rag_system() if use_rag else None
+    web_search = get_web_search() if use_web_search else None
+    context, sources = asyncio.run(gather_context(prompt, rag_system, web_search))
     
-    # Get chat history
-    messages = st.session_state.memory.get_messages()
-    messages.append({"role": "user", "content": prompt})
+    # Prepare specialized system prompt for financial queries
+    system_prompt = (
+        system_prompt_header(response_mode)
+        + (context if context else NO_CONTEXT_MESSAGE)
+        + "\n"
+    )
+    
+    # Get chat history (already ending with the new prompt), trimmed to the token budget
+    messages = trim_to_token_budget(
+        list(st.session_state.messages_cache),
+        config.AZURE_OPENAI_DEPLOYMENT_NAME,
+        config.MAX_HISTORY_TOKENS
+    )
     
     # Set max tokens based on response mode
     max_tokens = config.CONCISE_MAX_TOKENS if response_mode == "Concise" else config.DETAILED_MAX_TOKENS
     
-    # Generate response
-    response = st.session_state.llm_model.generate_response(
+    # Stream the response
+    response_stream = get_llm_model().generate_stream_response(
         messages=messages,
         system_prompt=system_prompt,
         max_tokens=max_tokens,
         temperature=0.7
     )
     
-    return response, sources
-
-def should_use_web_search(prompt: str) -> bool:
-    """Determine if web search should be used for this prompt"""
-    web_search_indicators = [
-        "latest", "recent", "current", "news", "today", "2024", "2025",
-        "what's happening", "breaking", "update", "trend", "stock price",
-        "analyst", "rating", "target price", "Q1", "Q2", "Q3", "Q4"
-    ]
-    return any(indicator in prompt.lower() for indicator in web_search_indicators)
+    return response_stream, sources
+
+@functools.lru_cache(maxsize=2)
+def system_prompt_header(response_mode: str) -> str:
+    """System prompt up to the context section; only two response modes exist"""
+    return SYSTEM_PROMPT_TEMPLATE.format(response_mode=response_mode)
+
+def should_use_web_search(prompt_lc: str) -> bool:
+    """Determine if web search should be used for this (already lowercased) prompt"""
+    return bool(_WEB_SEARCH_RE.search(prompt_lc))
 
 if __name__ == "__main__":
 
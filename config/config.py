@@ -23,6 +23,8 @@ class Config:
 
     # Application Paths
     MAX_HISTORY_LENGTH: int = 20
+    MAX_HISTORY_TOKENS: int = 6000
+    MAX_CONTEXT_TOKENS: int = 4000
     VECTOR_DB_PATH: str = "./vector_db"
     DOCUMENTS_PATH: str = "./documents"
 
@@ -45,6 +47,8 @@ class Config:
         self.TAVILY_API_KEY = os.getenv("TAVILY_API_KEY", "")
         
         self.MAX_HISTORY_LENGTH = int(os.getenv("MAX_HISTORY_LENGTH", "20"))
+        self.MAX_HISTORY_TOKENS = int(os.getenv("MAX_HISTORY_TOKENS", "6000"))
+        self.MAX_CONTEXT_TOKENS = int(os.getenv("MAX_CONTEXT_TOKENS", "4000"))
         self.VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", "./vector_db")
         self.DOCUMENTS_PATH = os.getenv("DOCUMENTS_PATH", "./documents")
         
@@ -80,6 +84,10 @@ class Config:
                 # Application Settings
                 if "MAX_HISTORY_LENGTH" in st.secrets:
                     self.MAX_HISTORY_LENGTH = int(st.secrets["MAX_HISTORY_LENGTH"])
+                if "MAX_HISTORY_TOKENS" in st.secrets:
+                    self.MAX_HISTORY_TOKENS = int(st.secrets["MAX_HISTORY_TOKENS"])
+                if "MAX_CONTEXT_TOKENS" in st.secrets:
+                    self.MAX_CONTEXT_TOKENS = int(st.secrets["MAX_CONTEXT_TOKENS"])
                 if "VECTOR_DB_PATH" in st.secrets:
                     self.VECTOR_DB_PATH = st.secrets["VECTOR_DB_PATH"]
                 if "DOCUMENTS_PATH" in st.secrets:
@@ -1,7 +1,10 @@
+import asyncio
 import numpy as np
 from typing import List, Any
-from openai import AzureOpenAI
+from openai import AzureOpenAI, AsyncAzureOpenAI
 from config.config import config
+from utils.cache import LRUCache, hash_text
+from utils.http import get_httpx_client
 import logging
 
 class AzureEmbeddingModel:
@@ -9,9 +12,12 @@ class AzureEmbeddingModel:
         self.client = AzureOpenAI(
             azure_endpoint=config.AZURE_OPENAI_EMBEDDING_ENDPOINT,
             api_key=config.AZURE_OPENAI_API_KEY,
-            api_version=config.AZURE_OPENAI_EMBEDDING_API_VERSION
+            api_version=config.AZURE_OPENAI_EMBEDDING_API_VERSION,
+            http_client=get_httpx_client()
         )
         self.deployment_name = config.AZURE_OPENAI_EMBEDDING_DEPLOYMENT
+        # Query embeddings keyed by text hash, so repeated questions skip the API call
+        self._query_cache = LRUCache(maxsize=1024)
     
     def get_embeddings(self, texts: List[str]) -> List[List[float]]:
         try:
@@ -25,6 +31,57 @@ class AzureEmbeddingModel:
             logging.error(f"Error generating embeddings: {str(e)}")
             return []
     
+    async def aget_embeddings_batched(
+        self,
+        texts: List[str],
+        batch_size: int = 16,
+        max_concurrency: int = 8,
+        max_retries: int = 3
+    ) -> List[List[float]]:
+        """Embed texts in fixed-size batches with several requests in flight.
+        
+        Returns an empty list if any batch fails, so callers never store a partial upload.
+        """
+        if not texts:
+            return []
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def embed_batch(client: AsyncAzureOpenAI, batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                response = await client.embeddings.create(
+                    model=self.deployment_name,
+                    input=batch
+                )
+                return [embedding.embedding for embedding in response.data]
+        
+        try:
+            # The SDK retries rate limits, timeouts, connection and 5xx errors with
+            # exponential backoff; client errors such as 400/401/404 fail immediately
+            async with AsyncAzureOpenAI(
+                azure_endpoint=config.AZURE_OPENAI_EMBEDDING_ENDPOINT,
+                api_key=config.AZURE_OPENAI_API_KEY,
+                api_version=config.AZURE_OPENAI_EMBEDDING_API_VERSION,
+                max_retries=max_retries
+            ) as client:
+                batches = await asyncio.gather(*[
+                    embed_batch(client, texts[i:i + batch_size])
+                    for i in range(0, len(texts), batch_size)
+                ])
+            return [embedding for batch in batches for embedding in batch]
+        
+        except Exception as e:
+            logging.error(f"Error generating embeddings: {str(e)}")
+            return []
+    
     def get_single_embedding(self, text: str) -> List[float]:
+        key = hash_text(text)
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            return cached
+        
         embeddings = self.get_embeddings([text])
-        return embeddings[0] if embeddings else []
\ No newline at end of file
+        if not embeddings:
+            return []
+        self._query_cache.put(key, embeddings[0])
+        return embeddings[0]
\ No newline at end of file
@@ -1,6 +1,7 @@
 from openai import AzureOpenAI
 from typing import List, Dict, Any, Optional
 from config.config import config
+from utils.http import get_httpx_client
 import logging
 
 class AzureOpenAIModel:
@@ -8,7 +9,8 @@ class AzureOpenAIModel:
         self.client = AzureOpenAI(
             azure_endpoint=config.AZURE_OPENAI_ENDPOINT,
             api_key=config.AZURE_OPENAI_API_KEY,
-            api_version=config.AZURE_OPENAI_API_VERSION
+            api_version=config.AZURE_OPENAI_API_VERSION,
+            http_client=get_httpx_client()
         )
         self.deployment_name = config.AZURE_OPENAI_DEPLOYMENT_NAME
         
@@ -59,7 +61,8 @@ class AzureOpenAIModel:
             )
             
             for chunk in response:
-                if chunk.choices[0].delta.content:
+                # Azure sends a first chunk with empty choices carrying prompt_filter_results
+                if chunk.choices and chunk.choices[0].delta.content:
                     yield chunk.choices[0].delta.content
         
         except Exception as e:
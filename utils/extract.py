@@ -0,0 +1,53 @@
+# utils/extract.py
+# Text extractors kept free of app, Streamlit and OpenAI imports so that
+# spawned worker processes can import them cheaply.
+import os
+import logging
+from typing import Optional
+import PyPDF2
+import docx
+
+def extract_text_from_pdf(file_path: str) -> str:
+    """Extract text from PDF file"""
+    try:
+        text = ""
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            for page in pdf_reader.pages:
+                text += page.extract_text() + "\n"
+        return text
+    except Exception as e:
+        logging.error(f"Error extracting PDF text: {e}")
+        return ""
+
+def extract_text_from_docx(file_path: str) -> str:
+    """Extract text from DOCX file"""
+    try:
+        doc = docx.Document(file_path)
+        text = ""
+        for paragraph in doc.paragraphs:
+            text += paragraph.text + "\n"
+        return text
+    except Exception as e:
+        logging.error(f"Error extracting DOCX text: {e}")
+        return ""
+
+def extract_text_from_txt(file_path: str) -> str:
+    """Extract text from TXT file"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            return file.read()
+    except Exception as e:
+        logging.error(f"Error extracting TXT text: {e}")
+        return ""
+
+def extract_text(file_path: str) -> Optional[str]:
+    """Extract text based on file type, or None if the type is unsupported"""
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext == '.pdf':
+        return extract_text_from_pdf(file_path)
+    elif file_ext == '.docx':
+        return extract_text_from_docx(file_path)
+    elif file_ext == '.txt':
+        return extract_text_from_txt(file_path)
+    return None
\ No newline at end of file
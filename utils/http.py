@@ -0,0 +1,26 @@
+# utils/http.py
+import functools
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+@functools.lru_cache(maxsize=None)
+def get_requests_session() -> requests.Session:
+    """Process-wide requests session so TCP/TLS connections are reused"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=3, backoff_factor=0.3)
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+@functools.lru_cache(maxsize=None)
+def get_httpx_client() -> httpx.Client:
+    """Process-wide httpx client shared by the synchronous Azure OpenAI clients"""
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+    )
\ No newline at end of file
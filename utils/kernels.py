@@ -0,0 +1,82 @@
+# utils/kernels.py
+import functools
+from typing import Callable, Tuple
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional; without it the NumPy versions below are used
+    njit = None
+
+# Rows of int8 codes widened to float32 at a time by the NumPy fallback
+BLOCK_ROWS = 4096
+
+def _topk_int8_numpy(codes: np.ndarray, scaled_query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Score every row in blocks, then select the k best with argpartition"""
+    scores = np.empty(len(codes), dtype=np.float32)
+    for start in range(0, len(codes), BLOCK_ROWS):
+        block = codes[start:start + BLOCK_ROWS]
+        scores[start:start + len(block)] = block.astype(np.float32) @ scaled_query
+    top = np.argpartition(scores, -k)[-k:]
+    top = top[np.argsort(scores[top])[::-1]]
+    return top, scores[top]
+
+if njit is not None:
+    @njit(fastmath=True, cache=True)
+    def _heap_replace(heap_idx, heap_score, idx, score):
+        """Replace the root of a k-sized min-heap (current k-th best) and sift it down"""
+        k = len(heap_score)
+        pos = 0
+        while True:
+            child = 2 * pos + 1
+            if child >= k:
+                break
+            if child + 1 < k and heap_score[child + 1] < heap_score[child]:
+                child += 1
+            if heap_score[child] >= score:
+                break
+            heap_score[pos] = heap_score[child]
+            heap_idx[pos] = heap_idx[child]
+            pos = child
+        heap_score[pos] = score
+        heap_idx[pos] = idx
+
+@functools.lru_cache(maxsize=4)
+def make_topk_int8(dim: int) -> Callable[[np.ndarray, np.ndarray, int], Tuple[np.ndarray, np.ndarray]]:
+    """Build a top-k int8 scan specialized for one embedding dimension.
+    
+    With Numba, `dim` is captured as a compile-time constant so LLVM can fully
+    unroll and vectorize the inner dot product. Without it, the NumPy scan is used.
+    """
+    def topk(codes: np.ndarray, scaled_query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and scores of the k rows of `codes` with the highest dot product, best first"""
+        # The compiled kernel skips bounds checks, so validate its inputs here
+        if codes.ndim != 2 or codes.shape[1] != dim or len(scaled_query) != dim:
+            raise ValueError(f"Expected {dim}-dimensional codes and query, got {codes.shape} and {scaled_query.shape}")
+        k = min(k, len(codes))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if njit is None:
+            return _topk_int8_numpy(codes, scaled_query, k)
+        # Numba needs a plain ndarray; asarray views a memmap without copying
+        return kernel(np.asarray(codes), scaled_query.astype(np.float32), k)
+    
+    if njit is None:
+        return topk
+    
+    @njit(fastmath=True, boundscheck=False)
+    def kernel(codes, scaled_query, k):
+        """Score rows and keep the k best in a min-heap, in a single pass"""
+        heap_idx = np.full(k, -1, dtype=np.int64)
+        heap_score = np.full(k, -np.inf, dtype=np.float32)
+        for i in range(codes.shape[0]):
+            score = np.float32(0.0)
+            for j in range(dim):
+                score += codes[i, j] * scaled_query[j]
+            if score > heap_score[0]:
+                _heap_replace(heap_idx, heap_score, i, score)
+        order = np.argsort(heap_score)[::-1]
+        return heap_idx[order], heap_score[order]
+    
+    return topk
@@ -2,6 +2,8 @@ from typing import List, Dict, Any
 import json
 import os
 from datetime import datetime
+from config.config import config
+from utils.tokens import count_tokens
 
 class ChatMemory:
     def __init__(self, session_id: str, max_length: int = 20):
@@ -9,6 +11,11 @@ class ChatMemory:
         self.max_length = max_length
         self.memory_file = f"./memory/chat_{session_id}.json"
         self.messages = self.load_memory()
+        
+        # Token counts are stored per message so history is tokenized only once
+        for message in self.messages:
+            if "token_count" not in message:
+                message["token_count"] = count_tokens(message["content"], config.AZURE_OPENAI_DEPLOYMENT_NAME)
     
     def load_memory(self) -> List[Dict[str, Any]]:
         """Load chat history from file"""
@@ -36,7 +43,8 @@ class ChatMemory:
             "role": role,
             "content": content,
             "timestamp": datetime.now().isoformat(),
-            "metadata": metadata or {}
+            "metadata": metadata or {},
+            "token_count": count_tokens(content, config.AZURE_OPENAI_DEPLOYMENT_NAME)
         }
         self.messages.append(message)
         
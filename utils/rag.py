@@ -1,91 +1,132 @@
 # utils/rag.py
+import asyncio
+import json
 import os
+import re
+import hashlib
+import itertools
+import multiprocessing
 import pickle
-from typing import List, Dict, Any, Tuple
+import shutil
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from models.embeddings import AzureEmbeddingModel
-import PyPDF2
-import docx
+from config.config import config
+from utils.cache import LRUCache, hash_text
+from utils.kernels import make_topk_int8
+from utils.http import get_requests_session
+from utils import extract
 import logging
-import requests
-from io import BytesIO
+from email.utils import formatdate
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from usearch.index import Index
+except ImportError:
+    # HNSW index is optional; without it every search is an exact scan
+    Index = None
+
+# Below this many chunks an exact scan is as fast as HNSW and has perfect recall
+HNSW_MIN_DOCUMENTS = 5000
+
+# Exact search scans int8 codes first and re-scores this many candidates in float32
+RERANK_CANDIDATES = 100
+# Rows re-quantized at a time when the int8 scales widen
+REQUANTIZE_BLOCK_ROWS = 4096
+
+FINANCIAL_KEYWORDS = [
+    "revenue", "income", "profit", "AWS", "segment", "growth",
+    "earnings", "EBITDA", "cash flow", "operating", "margin",
+    "investment", "shareholder", "dividend", "stock", "forecast",
+    "guidance", "financial", "metrics", "quarterly", "annual"
+]
+# One pass over the lowercased query for all keywords; whole words only, plurals allowed
+_FINANCIAL_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(keyword.lower()) for keyword in FINANCIAL_KEYWORDS) + r")s?\b"
+)
 
 class DocumentProcessor:
     def __init__(self):
-        self.embedding_model = AzureEmbeddingModel()
         self.default_pdf_url = "https://s2.q4cdn.com/299287126/files/doc_financials/2023/ar/Amazon-com-Inc-2023-Annual-Report.pdf"
     
-    def load_default_pdf(self) -> str:
-        """Load the default Amazon annual report PDF"""
+    def download_default_pdf(self) -> Optional[str]:
+        """Download the default PDF to the documents cache, skipping it if unchanged"""
+        url_hash = hashlib.sha256(self.default_pdf_url.encode('utf-8')).hexdigest()[:16]
+        cache_path = os.path.join(config.DOCUMENTS_PATH, f"{url_hash}.pdf")
+        
+        headers = {}
+        if os.path.exists(cache_path):
+            headers['If-Modified-Since'] = formatdate(os.path.getmtime(cache_path), usegmt=True)
+        
         try:
-            response = requests.get(self.default_pdf_url)
-            response.raise_for_status()
-            
-            text = ""
-            with BytesIO(response.content) as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            return text
+            with get_requests_session().get(self.default_pdf_url, headers=headers, stream=True, timeout=60) as response:
+                if response.status_code == 304:
+                    return cache_path
+                response.raise_for_status()
+                
+                # Stream straight to disk instead of buffering the whole PDF in memory
+                os.makedirs(config.DOCUMENTS_PATH, exist_ok=True)
+                response.raw.decode_content = True
+                with open(f"{cache_path}.part", 'wb') as f:
+                    shutil.copyfileobj(response.raw, f)
+                os.replace(f"{cache_path}.part", cache_path)
+            return cache_path
         except Exception as e:
-            logging.error(f"Error loading default PDF: {e}")
+            if os.path.exists(cache_path):
+                logging.warning(f"Could not refresh default PDF, using cached copy: {e}")
+                return cache_path
+            logging.error(f"Error downloading default PDF: {e}")
+            return None
+    
+    def load_default_pdf(self) -> str:
+        """Load the default Amazon annual report PDF"""
+        pdf_path = self.download_default_pdf()
+        if not pdf_path:
             return ""
+        return self.extract_text_from_pdf(pdf_path)
     
     def extract_text_from_pdf(self, file_path: str) -> str:
         """Extract text from PDF file"""
-        try:
-            text = ""
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            return text
-        except Exception as e:
-            logging.error(f"Error extracting PDF text: {e}")
-            return ""
+        return extract.extract_text_from_pdf(file_path)
     
     def extract_text_from_docx(self, file_path: str) -> str:
         """Extract text from DOCX file"""
-        try:
-            doc = docx.Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
-        except Exception as e:
-            logging.error(f"Error extracting DOCX text: {e}")
-            return ""
+        return extract.extract_text_from_docx(file_path)
     
     def extract_text_from_txt(self, file_path: str) -> str:
         """Extract text from TXT file"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read()
-        except Exception as e:
-            logging.error(f"Error extracting TXT text: {e}")
-            return ""
+        return extract.extract_text_from_txt(file_path)
+    
+    def extract_text(self, file_path: str) -> Optional[str]:
+        """Extract text based on file type, or None if the type is unsupported"""
+        return extract.extract_text(file_path)
     
     def chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
         """Split text into chunks with overlap"""
-        chunks = []
-        start = 0
-        text_length = len(text)
-        
-        while start < text_length:
-            end = start + chunk_size
-            chunk = text[start:end]
-            chunks.append(chunk)
-            start = end - overlap
-        
-        return chunks
+        # Each chunk starts chunk_size - overlap after the previous one
+        return [text[start:start + chunk_size] for start in range(0, len(text), chunk_size - overlap)]
 
 class VectorStore:
     def __init__(self, store_path: str = "./vector_store"):
         self.store_path = store_path
         self.embedding_model = AzureEmbeddingModel()
         self.documents = []
-        self.embeddings = []
+        # L2-normalized rows, so cosine similarity is a single mat-vec product.
+        # Once persisted this is a read-only memmap over embeddings.f32.
+        self.embeddings = np.empty((0, 0), dtype=np.float32)
+        # int8 codes of the same rows (embeddings.i8) with per-dimension scales
+        self.codes = np.empty((0, 0), dtype=np.int8)
+        self._scale = None
+        # Coarse-scan kernel specialized for the embedding dimension, built with the codes
+        self._kernel = None
+        # Documents (and their JSONL bytes) recorded in meta.json, i.e. safely on disk
+        self._persisted_count = 0
+        self._documents_bytes = 0
+        self.index = None
+        # Bumped on every change to the corpus so cached search results expire
+        self._version = 0
+        self._lock = threading.RLock()
         self.load_store()
         
         # Initialize with default document if store is empty
@@ -101,6 +142,7 @@ class VectorStore:
             documents = [{
                 'content': chunk,
                 'source': 'Amazon-com-Inc-2023-Annual-Report.pdf',
+                'display_name': 'Amazon-com-Inc-2023-Annual-Report.pdf',
                 'chunk_id': i,
                 'metadata': {'file_type': 'pdf', 'is_default': True}
             } for i, chunk in enumerate(chunks)]
@@ -109,35 +151,246 @@ class VectorStore:
     def load_store(self):
         """Load existing vector store"""
         try:
-            if os.path.exists(f"{self.store_path}/documents.pkl"):
+            if os.path.exists(f"{self.store_path}/meta.json"):
+                with open(f"{self.store_path}/meta.json", 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                count, dim = meta['count'], meta['dim']
+                
+                # meta.json is written last, so only its row count is trusted
+                with open(f"{self.store_path}/documents.jsonl", 'rb') as f:
+                    lines = list(itertools.islice(f, count))
+                # A line without its newline is a torn write
+                while lines and not lines[-1].endswith(b"\n"):
+                    lines.pop()
+                embeddings_path = f"{self.store_path}/embeddings.f32"
+                embedding_rows = os.path.getsize(embeddings_path) // (dim * 4) if dim and os.path.exists(embeddings_path) else 0
+                
+                # Documents and embedding rows must line up; keep only the intact common prefix
+                valid = min(count, len(lines), embedding_rows)
+                if valid != count:
+                    logging.warning(
+                        f"Vector store lists {count} documents but only {valid} are intact; truncating to match"
+                    )
+                self.documents = [json.loads(line) for line in lines[:valid]]
+                self._persisted_count = valid
+                self._documents_bytes = sum(len(line) for line in lines[:valid])
+                if valid:
+                    self.embeddings = np.memmap(
+                        embeddings_path,
+                        dtype=np.float32,
+                        mode='r',
+                        shape=(valid, dim)
+                    )
+                    self.load_codes()
+                if valid != count:
+                    self._write_meta()
+            elif os.path.exists(f"{self.store_path}/documents.pkl"):
+                # Migrate a store written by the old pickle format
                 with open(f"{self.store_path}/documents.pkl", 'rb') as f:
-                    self.documents = pickle.load(f)
+                    documents = pickle.load(f)
                 with open(f"{self.store_path}/embeddings.pkl", 'rb') as f:
-                    self.embeddings = pickle.load(f)
+                    embeddings = self._normalize(pickle.load(f))
+                if documents and embeddings.size:
+                    self.documents = documents
+                    self._append_embeddings(embeddings)
+                    self.save_store()
+            self.load_index()
         except Exception as e:
             logging.error(f"Error loading vector store: {e}")
     
+    def load_codes(self):
+        """Map the int8 codes, quantizing the float32 rows if they are missing"""
+        count, dim = self.embeddings.shape
+        codes_path = f"{self.store_path}/embeddings.i8"
+        scale_path = f"{self.store_path}/quant_scale.npy"
+        if (os.path.exists(scale_path) and os.path.exists(codes_path)
+                and os.path.getsize(codes_path) >= count * dim):
+            self._scale = np.load(scale_path)
+            self.codes = np.memmap(codes_path, dtype=np.int8, mode='r', shape=(count, dim))
+            self._kernel = make_topk_int8(dim)
+        else:
+            # Store predates quantization, or a requantization was interrupted
+            self._scale = None
+            self._update_quantizer(self.embeddings)
+            self._requantize_codes()
+    
+    def _update_quantizer(self, rows: np.ndarray) -> bool:
+        """Widen the symmetric per-dimension int8 scales to cover rows; True if they changed.
+        
+        Scales only ever grow to the running max |x_j| / 127, so they end up the same as
+        if fitted on the whole corpus, however small the first batch was.
+        """
+        needed = (np.abs(rows).max(axis=0) / 127.0).astype(np.float32)
+        if self._scale is not None and np.all(needed <= self._scale):
+            return False
+        scale = needed if self._scale is None else np.maximum(self._scale, needed)
+        # Floor at a tiny value so an all-zero dimension can still widen later
+        self._scale = np.maximum(scale, np.float32(1e-8))
+        self._kernel = make_topk_int8(rows.shape[1])
+        return True
+    
+    def _requantize_codes(self):
+        """Rewrite embeddings.i8 from the float32 rows with the current scales"""
+        dim = self.embeddings.shape[1]
+        codes = np.empty((0, dim), dtype=np.int8)
+        # Drop the old mapping before its file is truncated
+        self.codes = codes
+        for start in range(0, len(self.embeddings), REQUANTIZE_BLOCK_ROWS):
+            block = self.embeddings[start:start + REQUANTIZE_BLOCK_ROWS]
+            codes = self._append_rows("embeddings.i8", codes, self._quantize(block))
+        self.codes = codes
+        self._save_scale()
+    
+    def _save_scale(self):
+        """Persist the int8 scales; written after the codes they describe"""
+        try:
+            os.makedirs(self.store_path, exist_ok=True)
+            np.save(f"{self.store_path}/quant_scale.npy", self._scale)
+        except Exception as e:
+            logging.error(f"Error saving quantization scales: {e}")
+    
+    def _quantize(self, rows: np.ndarray) -> np.ndarray:
+        """Quantize float32 rows to int8 codes, clipping values outside the fitted range"""
+        return np.clip(np.rint(rows / self._scale), -127, 127).astype(np.int8)
+    
+    def _new_index(self):
+        """Create an empty HNSW index matching the embedding dimension"""
+        return Index(
+            ndim=self.embeddings.shape[1],
+            metric='cos',
+            dtype='f16',
+            connectivity=16,
+            expansion_add=128
+        )
+    
+    def load_index(self):
+        """Load the persisted HNSW index, rebuilding it if missing or stale"""
+        if Index is None or len(self.documents) < HNSW_MIN_DOCUMENTS:
+            self.index = None
+            return
+        
+        index_path = f"{self.store_path}/index.usearch"
+        if os.path.exists(index_path):
+            try:
+                index = self._new_index()
+                index.load(index_path)
+                if len(index) == len(self.documents):
+                    self.index = index
+                    return
+            except Exception as e:
+                logging.error(f"Error loading HNSW index: {e}")
+        
+        self.index = self._new_index()
+        self.index.add(np.arange(len(self.embeddings)), self.embeddings)
+    
+    def _append_rows(self, filename: str, current: np.ndarray, new_rows: np.ndarray) -> np.ndarray:
+        """Append rows to a raw matrix file and remap it, keeping them in memory if that fails"""
+        count = len(current)
+        row_bytes = new_rows.shape[1] * new_rows.itemsize
+        path = f"{self.store_path}/{filename}"
+        try:
+            os.makedirs(self.store_path, exist_ok=True)
+            with open(path, 'ab') as f:
+                if f.tell() < count * row_bytes:
+                    # An earlier append failed and those rows only exist in memory; rewrite them all
+                    f.truncate(0)
+                    f.write(np.ascontiguousarray(current).tobytes())
+                elif f.tell() > count * row_bytes:
+                    # Drop any rows left behind by an interrupted write
+                    f.truncate(count * row_bytes)
+                f.write(np.ascontiguousarray(new_rows).tobytes())
+            return np.memmap(
+                path,
+                dtype=new_rows.dtype,
+                mode='r',
+                shape=(count + len(new_rows), new_rows.shape[1])
+            )
+        except Exception as e:
+            logging.error(f"Error writing {filename}: {e}")
+            if current.size:
+                return np.vstack([current, new_rows])
+            return new_rows
+    
+    def _append_embeddings(self, new_rows: np.ndarray):
+        """Append normalized rows and their int8 codes to the store"""
+        self.embeddings = self._append_rows("embeddings.f32", self.embeddings, new_rows)
+        if self._update_quantizer(new_rows):
+            # New rows fall outside the fitted range; requantize everything with the wider scales
+            self._requantize_codes()
+        else:
+            self.codes = self._append_rows("embeddings.i8", self.codes, self._quantize(new_rows))
+    
+    def _write_meta(self):
+        """Atomically record the persisted document count and layout in meta.json"""
+        meta = {
+            'count': self._persisted_count,
+            'dim': self.embeddings.shape[1],
+            'documents_bytes': self._documents_bytes
+        }
+        with open(f"{self.store_path}/meta.json.tmp", 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(f"{self.store_path}/meta.json.tmp", f"{self.store_path}/meta.json")
+    
     def save_store(self):
-        """Save vector store"""
+        """Save vector store, appending every document not yet persisted"""
         try:
+            if not (isinstance(self.embeddings, np.memmap) and len(self.embeddings) == len(self.documents)):
+                # Some embedding rows only exist in memory; keep the last consistent snapshot on disk
+                logging.error("Embeddings file is behind the documents; vector store not saved")
+                return
+            
             os.makedirs(self.store_path, exist_ok=True)
-            with open(f"{self.store_path}/documents.pkl", 'wb') as f:
-                pickle.dump(self.documents, f)
-            with open(f"{self.store_path}/embeddings.pkl", 'wb') as f:
-                pickle.dump(self.embeddings, f)
+            start = self._persisted_count
+            offset = self._documents_bytes if start else 0
+            payload = "".join(
+                json.dumps(doc, ensure_ascii=False) + "\n" for doc in self.documents[start:]
+            ).encode('utf-8')
+            with open(f"{self.store_path}/documents.jsonl", 'ab') as f:
+                f.truncate(offset)
+                f.write(payload)
+            
+            self._persisted_count = len(self.documents)
+            self._documents_bytes = offset + len(payload)
+            self._write_meta()
+            
+            if self.index is not None:
+                self.index.save(f"{self.store_path}/index.usearch")
         except Exception as e:
             logging.error(f"Error saving vector store: {e}")
     
-    def add_documents(self, documents: List[Dict[str, Any]]):
-        """Add documents to vector store"""
+    @staticmethod
+    def _normalize(embeddings) -> np.ndarray:
+        """Convert embeddings to a contiguous float32 matrix with unit-length rows"""
+        matrix = np.array(embeddings, dtype=np.float32, ndmin=2)
+        if matrix.size == 0:
+            return np.empty((0, 0), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+        return matrix
+    
+    def add_documents(self, documents: List[Dict[str, Any]]) -> int:
+        """Add documents to vector store, returning how many were stored"""
         texts = [doc['content'] for doc in documents]
-        embeddings = self.embedding_model.get_embeddings(texts)
+        embeddings = asyncio.run(self.embedding_model.aget_embeddings_batched(texts))
+        if not embeddings:
+            return 0
         
-        for doc, embedding in zip(documents, embeddings):
-            self.documents.append(doc)
-            self.embeddings.append(embedding)
-        
-        self.save_store()
+        new_rows = self._normalize(embeddings)
+        # The store may be shared across sessions, so mutate it under the lock
+        with self._lock:
+            start = len(self.documents)
+            self.documents.extend(documents[:len(new_rows)])
+            self._append_embeddings(new_rows)
+            
+            if self.index is not None:
+                self.index.add(np.arange(start, start + len(new_rows)), new_rows)
+            else:
+                self.load_index()
+            
+            self._version += 1
+            self.save_store()
+        return len(new_rows)
     
     def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """Search for similar documents"""
@@ -148,14 +401,43 @@ class VectorStore:
         if not query_embedding:
             return []
         
-        similarities = cosine_similarity([query_embedding], self.embeddings)[0]
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query_vector)
+        if query_norm == 0:
+            return []
+        
+        # Hold the lock so a concurrent add_documents can't swap arrays mid-search
+        with self._lock:
+            return self._search_vector(query_vector / query_norm, top_k)
+    
+    def _search_vector(self, query_vector: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+        """Rank stored documents against a unit-length query vector"""
+        if self.index is not None:
+            matches = self.index.search(query_vector, top_k)
+            return [{
+                **self.documents[int(key)],
+                'similarity': 1.0 - float(distance)
+            } for key, distance in zip(matches.keys, matches.distances)]
+        
+        num_candidates = max(RERANK_CANDIDATES, top_k)
+        if len(self.documents) > num_candidates:
+            # Coarse scan over the int8 codes, then exact float32 scores for the best candidates
+            candidates, _ = self._kernel(self.codes, query_vector * self._scale, num_candidates)
+            candidates.sort()
+        else:
+            candidates = np.arange(len(self.documents))
+        similarities = self.embeddings[candidates] @ query_vector
+        
+        # argpartition selects the top_k in O(N); only those k are then sorted
+        top_k = min(top_k, len(similarities))
+        top_indices = np.argpartition(similarities, -top_k)[-top_k:]
+        top_indices = top_indices[np.argsort(similarities[top_indices])[::-1]]
         
         results = []
         for idx in top_indices:
             results.append({
-                **self.documents[idx],
-                'similarity': similarities[idx]
+                **self.documents[candidates[idx]],
+                'similarity': float(similarities[idx])
             })
         
         return results
@@ -164,32 +446,32 @@ class RAGSystem:
     def __init__(self):
         self.document_processor = DocumentProcessor()
         self.vector_store = VectorStore()
-        self.financial_keywords = [
-            "revenue", "income", "profit", "AWS", "segment", "growth",
-            "earnings", "EBITDA", "cash flow", "operating", "margin",
-            "investment", "shareholder", "dividend", "stock", "forecast",
-            "guidance", "financial", "metrics", "quarterly", "annual"
-        ]
+        self.financial_keywords = FINANCIAL_KEYWORDS
+        self._context_cache = LRUCache(maxsize=256)
 
     
     def process_and_store_documents(self, file_paths: List[str]):
-        """Process and store documents in vector store"""
+        """Process and store documents in vector store, returning the number of chunks stored"""
         documents = []
+        file_paths = [path for path in file_paths if os.path.exists(path)]
+        
+        # PDF extraction is pure-Python and holds the GIL, so spread files over processes;
+        # every chunk is then embedded in one batched call. Workers are spawned rather than
+        # forked from the multi-threaded server, and only import the light utils.extract.
+        if len(file_paths) > 1:
+            with ProcessPoolExecutor(
+                max_workers=min(len(file_paths), os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                texts = list(executor.map(extract.extract_text, file_paths))
+        else:
+            texts = [self.document_processor.extract_text(path) for path in file_paths]
         
-        for file_path in file_paths:
-            if not os.path.exists(file_path):
+        for file_path, text in zip(file_paths, texts):
+            if text is None:
                 continue
-            
-            # Extract text based on file type
             file_ext = os.path.splitext(file_path)[1].lower()
-            if file_ext == '.pdf':
-                text = self.document_processor.extract_text_from_pdf(file_path)
-            elif file_ext == '.docx':
-                text = self.document_processor.extract_text_from_docx(file_path)
-            elif file_ext == '.txt':
-                text = self.document_processor.extract_text_from_txt(file_path)
-            else:
-                continue
+            display_name = os.path.basename(file_path)
             
             # Chunk the text
             chunks = self.document_processor.chunk_text(text)
@@ -199,27 +481,41 @@ class RAGSystem:
                 documents.append({
                     'content': chunk,
                     'source': file_path,
+                    'display_name': display_name,
                     'chunk_id': i,
                     'metadata': {'file_type': file_ext, 'is_default': False}
                 })
         
         # Add to vector store
-        self.vector_store.add_documents(documents)
-        return len(documents)
+        return self.vector_store.add_documents(documents)
     
-    def retrieve_relevant_context(self, query: str, top_k: int = 3) -> Tuple[str, bool]:
-        """Retrieve relevant context for RAG, return context and whether it's financial"""
+    def retrieve_relevant_context(self, query: str, top_k: int = 3, query_lc: Optional[str] = None) -> Tuple[str, bool]:
+        """Retrieve relevant context for RAG, return context and whether it's financial.
+        
+        Pass query_lc when the caller already has the lowercased query.
+        """
+        cache_key = (hash_text(query), top_k, self.vector_store._version)
+        cached = self._context_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         results = self.vector_store.search(query, top_k)
         
         if not results:
             return "", False
         
-        is_financial = any(keyword in query.lower() for keyword in self.financial_keywords)
+        is_financial = bool(_FINANCIAL_RE.search(query_lc or query.lower()))
         
-        context = "Relevant information from documents:\n\n"
-        for i, result in enumerate(results, 1):
-            source_name = os.path.basename(result['source'])
-            context += f"Source {i} (from {source_name}):\n"
-            context += f"{result['content']}\n\n"
+        # display_name is set at ingest; older stores only have the source path
+        context = "Relevant information from documents:\n\n" + "".join(
+            f"Source {i} (from {result.get('display_name') or os.path.basename(result['source'])}):\n"
+            f"{result['content']}\n\n"
+            for i, result in enumerate(results, 1)
+        )
         
-        return context, is_financial
\ No newline at end of file
+        self._context_cache.put(cache_key, (context, is_financial))
+        return context, is_financial
+    
+    async def aretrieve_relevant_context(self, query: str, top_k: int = 3, query_lc: Optional[str] = None) -> Tuple[str, bool]:
+        """Run retrieve_relevant_context in a worker thread so it can overlap with other I/O"""
+        return await asyncio.to_thread(self.retrieve_relevant_context, query, top_k, query_lc)
\ No newline at end of file
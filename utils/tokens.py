@@ -0,0 +1,65 @@
+# utils/tokens.py
+import functools
+import logging
+from typing import List, Dict, Any
+import tiktoken
+
+@functools.lru_cache(maxsize=8)
+def get_encoding(model: str):
+    """Tokenizer for a model, falling back to o200k_base for Azure deployment names"""
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # tiktoken downloads its vocabularies on first use, which can fail offline
+        logging.warning(f"Could not load tokenizer, estimating token counts: {e}")
+        return None
+
+def count_tokens(text: str, model: str) -> int:
+    """Number of tokens in text for the given model"""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_to_token_budget(text: str, model: str, budget: int) -> str:
+    """Cut text down to at most `budget` tokens"""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return text[:budget * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= budget:
+        return text
+    return encoding.decode(tokens[:budget])
+
+def trim_to_token_budget(
+    messages: List[Dict[str, Any]],
+    model: str,
+    budget: int = 6000
+) -> List[Dict[str, str]]:
+    """Drop the oldest non-system messages until the conversation fits the budget.
+    
+    Uses a message's precomputed 'token_count' when present so history is
+    tokenized once rather than on every turn. The newest message is always kept.
+    """
+    counts = [
+        msg.get("token_count") or count_tokens(msg["content"], model)
+        for msg in messages
+    ]
+    total = sum(counts)
+    keep = [True] * len(messages)
+    
+    for i, msg in enumerate(messages[:-1]):
+        if total <= budget:
+            break
+        if msg["role"] == "system":
+            continue
+        keep[i] = False
+        total -= counts[i]
+    
+    return [
+        {"role": msg["role"], "content": msg["content"]}
+        for msg, kept in zip(messages, keep) if kept
+    ]
\ No newline at end of file
@@ -36,11 +36,15 @@
 
 
 # utils/web_search.py
+import asyncio
 from tavily import TavilyClient
 from config.config import config
 import logging
 from typing import List, Dict, Any
 
+# Characters of each result's content pasted into the prompt
+MAX_RESULT_CONTENT_CHARS = 300
+
 class WebSearchTool:
     def __init__(self):
         self.client = TavilyClient(api_key=config.TAVILY_API_KEY)
@@ -64,28 +68,33 @@ class WebSearchTool:
                 search_depth="advanced",
                 max_results=max_results,
                 include_domains=self.financial_sites,
-                include_answer=True,
-                include_raw_content=True
+                include_answer=True
             )
             return response
         except Exception as e:
             logging.error(f"Error performing web search: {e}")
             return {"results": []}
     
+    async def asearch(self, query: str, max_results: int = 3) -> Dict[str, Any]:
+        """Run search in a worker thread so it can overlap with other I/O"""
+        return await asyncio.to_thread(self.search, query, max_results)
+    
     def format_search_results(self, search_results: Dict[str, Any]) -> str:
         """Format search results for context"""
         if not search_results.get("results"):
             return "No relevant financial information found."
         
-        formatted_results = "Financial web search results:\n\n"
+        parts = ["Financial web search results:\n\n"]
         for i, result in enumerate(search_results["results"], 1):
-            formatted_results += f"Source {i}:\n"
-            formatted_results += f"Title: {result.get('title', 'N/A')}\n"
-            formatted_results += f"URL: {result.get('url', 'N/A')}\n"
-            formatted_results += f"Content: {result.get('content', 'N/A')[:500]}...\n\n"
+            parts.append(
+                f"Source {i}:\n"
+                f"Title: {result.get('title', 'N/A')}\n"
+                f"URL: {result.get('url', 'N/A')}\n"
+                f"Content: {result.get('content', 'N/A')[:MAX_RESULT_CONTENT_CHARS]}...\n\n"
+            )
         
         # Include Tavily's answer if available
         if search_results.get("answer"):
-            formatted_results += f"Quick Answer: {search_results['answer']}\n"
+            parts.append(f"Quick Answer: {search_results['answer']}\n")
         
-        return formatted_results
\ No newline at end of file
+        return "".join(parts)
\ No newline at end of file